@@ -13,7 +13,8 @@ Features
   - Select historical data period and price interval. **Interval options are dynamically filtered based on the selected period.**
   - Refresh data on demand with basic validation and helpful messages.
 - **Data fetching & caching:**
-  - Caches data and user selections in `st.session_state` to avoid redundant fetches (`active_tickers`, `active_quantities`, `active_period`, `active_interval`, `data`).
+  - Caches data and user selections in `st.session_state` to avoid redundant fetches (`active_tickers`, `active_quantities`, `active_period`, `active_interval`, `data`) plus the wide Close panel built from it (`price_wide`).
+  - Market data downloads are memoized with `st.cache_data` (5-minute TTL), keyed on the sorted tickers, period and interval.
 - **PnL & position metrics:**
   - Computes per ticker PnL in absolute ($) and percentage terms from first to last bar in the selected period/interval.
   - Calculates position values based on latest prices and quantities.
@@ -27,7 +28,7 @@ Features
 
 - **Visualization:**
   - Styled per-ticker PnL DataFrame with green/red highlighting for gains/losses.
-  - Portfolio PnL Over Time line chart by ticker (Altair).
+  - Portfolio PnL Over Time line chart by ticker (Altair; Plotly WebGL traces for large series).
   - Pie charts with percentage labels inside slices and centered titles.
 
 - **Advanced risk & performance metrics:**
@@ -113,6 +114,8 @@ quantities = st.session_state.active_quantities
 period = st.session_state.active_period
 interval = st.session_state.active_interval
 data = st.session_state.data
+# Wide Close panel, rebuilt only when the data is refetched (see state_manager)
+price_wide = st.session_state.get("price_wide")
 
 # --- Title ---
 st.title("📈 TradeSentinel-demo1")
@@ -123,7 +126,7 @@ if not st.session_state.data:
     st.stop()
 
 # --- PnL Calculation (per ticker snapshot) ---
-pnl_data = calculate_pnl(data, quantities)
+pnl_data = calculate_pnl(data, quantities, price_wide)
 
 # --- Display  ---
 if pnl_data is not None and not pnl_data.empty:
@@ -135,7 +138,7 @@ if pnl_data is not None and not pnl_data.empty:
     render_portfolio_summary(df_pnl)
   
     # --- Render Block: Chart - Allocation by Sector - Advanced Metrics - Editable Table ---    
-    render_block(data, quantities)
+    render_block(data, quantities, price_wide)
       
 # Credits
 st.markdown("---")
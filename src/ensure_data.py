@@ -8,15 +8,18 @@ for one or more tickers using the Yahoo Finance API via the `yfinance` library.
 
 Features
 --------
-- Fetches historical OHLCV data for each ticker in **single-ticker mode** to avoid MultiIndex columns.
+- Fetches historical OHLCV data for all tickers in **one batched request** and splits the
+  result per ticker (a single ticker is fetched in single-ticker mode).
 - Supports configurable `period` and `interval` parameters.
 - Automatically adjusts prices for corporate actions (splits, dividends).
 - Ensures a 'Close' column exists:
   - If missing but 'Adj Close' is present, uses 'Adj Close' as a substitute.
   - Skips tickers with neither 'Close' nor 'Adj Close'.
 - Enriches each DataFrame with a constant 'Sector' column from yfinance metadata.
-- Caches sector lookups per run to minimize HTTP calls.
+- Caches sector lookups in memory and on disk to minimize HTTP calls; uncached
+  sectors are fetched concurrently in a thread pool while the price download runs.
 - Flattens any MultiIndex columns immediately after adding 'Sector'.
+- Stores 'Sector' as a pyarrow-backed string column.
 - Logs progress, warnings, and errors using `log_utils` functions.
 
 Functions
@@ -29,12 +32,13 @@ Returns
 dict[str, pandas.DataFrame]
     Mapping of ticker symbol to its corresponding DataFrame containing at least:
     - 'Close' (float)
-    - 'Sector' (string)
+    - 'Sector' (string[pyarrow])
     plus any other OHLCV columns returned by yfinance.
 
 Dependencies
 ------------
 - yfinance
+- pyarrow (for the 'Sector' string column)
 - pandas (implied via yfinance output)
 - log_utils (for logging)
 
@@ -44,8 +48,18 @@ Notes
 - Any exceptions during download or sector lookup are caught and logged.
 - Sector lookups are best-effort; failures result in Sector="Unknown" but do not
   prevent price data from being returned.
+- Resolved sectors are also persisted in a small SQLite cache
+  (`~/.tradesentinel/sectors.db`, 30-day expiry), so fresh processes skip the
+  HTTP lookup. "Unknown" results are not persisted.
 """
 
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+
 import pandas as pd
 import yfinance as yf
 from log_utils import info, warn, error
@@ -53,11 +67,83 @@ from log_utils import info, warn, error
 # Cache to avoid repeated sector lookups
 _sector_cache = {}
 
+# Upper bound on concurrent sector (HTTP) lookups
+_SECTOR_WORKERS = 16
+
+# On-disk sector cache shared across processes; sectors rarely change
+_SECTOR_DB_PATH = Path.home() / ".tradesentinel" / "sectors.db"
+_SECTOR_TTL_SECONDS = 30 * 24 * 3600
+
+# Disk cache state: None until first use, then True (schema ready) or False (disabled
+# for the rest of the process, e.g. read-only HOME). Guarded by _sector_db_lock since
+# lookups run on the pool threads.
+_sector_db_ready = None
+_sector_db_lock = threading.Lock()
+
+def _connect_sector_db():
+    """Open the sector cache DB, creating it once per process.
+
+    Returns None when the disk cache is unavailable; the failure is logged once.
+    """
+    global _sector_db_ready
+    with _sector_db_lock:
+        if _sector_db_ready is None:
+            try:
+                _SECTOR_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+                with closing(sqlite3.connect(_SECTOR_DB_PATH, timeout=5)) as conn, conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS sectors ("
+                        "ticker TEXT PRIMARY KEY, sector TEXT NOT NULL, fetched_at REAL NOT NULL)"
+                    )
+                _sector_db_ready = True
+            except (sqlite3.Error, OSError) as e:
+                warn(f"Sector disk cache unavailable, using the in-memory cache only: {e}")
+                _sector_db_ready = False
+    if not _sector_db_ready:
+        return None
+    return sqlite3.connect(_SECTOR_DB_PATH, timeout=5)
+
+def _load_sector(ticker: str):
+    """Return the sector stored on disk for a ticker, or None if absent or expired."""
+    try:
+        conn = _connect_sector_db()
+        if conn is None:
+            return None
+        with closing(conn):
+            row = conn.execute(
+                "SELECT sector, fetched_at FROM sectors WHERE ticker = ?", (ticker,)
+            ).fetchone()
+    except (sqlite3.Error, OSError) as e:
+        warn(f"Could not read sector cache for {ticker}: {e}")
+        return None
+    if row is None or time.time() - row[1] > _SECTOR_TTL_SECONDS:
+        return None
+    return row[0]
+
+def _store_sector(ticker: str, sector: str) -> None:
+    """Write a sector through to the on-disk cache (best-effort)."""
+    try:
+        conn = _connect_sector_db()
+        if conn is None:
+            return
+        with closing(conn), conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sectors (ticker, sector, fetched_at) VALUES (?, ?, ?)",
+                (ticker, sector, time.time())
+            )
+    except (sqlite3.Error, OSError) as e:
+        warn(f"Could not write sector cache for {ticker}: {e}")
+
 def _get_sector(ticker: str) -> str:
-    """Fetch sector for a ticker, with caching and graceful fallback."""
+    """Fetch sector for a ticker: in-memory cache, then disk cache, then yfinance."""
     if ticker in _sector_cache:
         return _sector_cache[ticker]
 
+    sector = _load_sector(ticker)
+    if sector is not None:
+        _sector_cache[ticker] = sector
+        return sector
+
     sector = "Unknown"
     try:
         yf_t = yf.Ticker(ticker)
@@ -70,67 +156,142 @@ def _get_sector(ticker: str) -> str:
     except Exception as e:
         warn(f"Could not fetch sector for {ticker}: {e}")
 
+    # "Unknown" may be a transient failure: keep it for this process only
+    if sector != "Unknown":
+        _store_sector(ticker, sector)
     _sector_cache[ticker] = sector
     return sector
 
-def ensure_prices(tickers, period="5d", interval="1d"):
+def _prefetch_sectors(tickers) -> None:
+    """Fill _sector_cache for uncached tickers with concurrent lookups."""
+    missing = [t for t in dict.fromkeys(tickers) if t not in _sector_cache]
+    if not missing:
+        return
+    with ThreadPoolExecutor(max_workers=min(_SECTOR_WORKERS, len(missing))) as pool:
+        # _get_sector stores each result in _sector_cache
+        list(pool.map(_get_sector, missing))
+
+def _prepare_frame(ticker: str, df: pd.DataFrame):
     """
-    Fetch historical price data for each ticker, ensure 'Close' exists,
-    flatten columns if needed, and add a 'Sector' column.
+    Ensure 'Close' exists, add a 'Sector' column and flatten columns.
 
-    Returns:
-        dict[ticker -> DataFrame] with flat column names
+    Returns the prepared DataFrame, or None if the ticker should be skipped.
     """
+    if df.empty:
+        warn(f"No data returned for {ticker}, skipping.")
+        return None
+
+    # Ensure 'Close' column exists
+    if "Close" not in df.columns:
+        if "Adj Close" in df.columns:
+            warn(f"'Close' missing for {ticker}, using 'Adj Close' instead.")
+            df["Close"] = df["Adj Close"]
+        else:
+            error(f"No 'Close' or 'Adj Close' column for {ticker}, skipping.")
+            return None
+
+    # Add sector as a constant column
+    df["Sector"] = _get_sector(ticker)
+
+    # Flatten columns immediately after adding Sector. Only the single-ticker download
+    # returns (Price, Ticker) columns; batched frames come out of xs() already flat.
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    # Sector is stored as Arrow strings rather than one Python object per row
+    df = df.astype({"Sector": "string[pyarrow]"})
+
+    return df
+
+def _ensure_prices_serial(tickers, period, interval):
+    """Per-ticker download loop (used for a single ticker)."""
     prices = {}
     for ticker in tickers:
         try:
             info(f"Fetching data for {ticker} ...")
-            # Force single-ticker mode and request flat columns
-            df = yf.download(
-                str(ticker),
+            # Look the sector up while the price request is in flight
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                sector_lookup = pool.submit(_get_sector, ticker)
+                # Force single-ticker mode and request flat columns
+                df = yf.download(
+                    str(ticker),
+                    period=period,
+                    interval=interval,
+                    progress=False,
+                    auto_adjust=True,
+                    group_by='column'  # prevent MultiIndex where possible
+                )
+                sector_lookup.result()
+
+            df = _prepare_frame(ticker, df)
+            if df is not None:
+                prices[ticker] = df
+
+        except Exception as e:
+            error(f"Error fetching data for {ticker}: {e}")
+
+    return prices
+
+def _ensure_prices_batch(tickers, period, interval):
+    """Download all tickers in one request and split the result per ticker."""
+    # Sector lookups don't depend on the prices: run them while the download is in flight
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        sector_lookup = pool.submit(_prefetch_sectors, tickers)
+        try:
+            info(f"Fetching data for {len(tickers)} tickers: {', '.join(tickers)} ...")
+            batch = yf.download(
+                " ".join(tickers),
                 period=period,
                 interval=interval,
                 progress=False,
                 auto_adjust=True,
-                group_by='column'  # prevent MultiIndex where possible
+                group_by='ticker',  # columns: (Ticker, Price)
+                threads=True
             )
+        except Exception as e:
+            error(f"Error fetching data for {', '.join(tickers)}: {e}")
+            return {}
+        # _prepare_frame below then reads sectors from _sector_cache
+        sector_lookup.result()
 
-            if df.empty:
+    returned = (
+        set(batch.columns.get_level_values(0))
+        if isinstance(batch.columns, pd.MultiIndex) else set()
+    )
+
+    prices = {}
+    for ticker in tickers:
+        try:
+            # Yahoo reports symbols upper-cased
+            symbol = ticker if ticker in returned else ticker.upper()
+            if symbol not in returned:
                 warn(f"No data returned for {ticker}, skipping.")
                 continue
 
-            # Ensure 'Close' column exists
-            if "Close" not in df.columns:
-                if "Adj Close" in df.columns:
-                    warn(f"'Close' missing for {ticker}, using 'Adj Close' instead.")
-                    df["Close"] = df["Adj Close"]
-                else:
-                    error(f"No 'Close' or 'Adj Close' column for {ticker}, skipping.")
-                    continue
-
-            # Add sector as a constant column
-            df["Sector"] = _get_sector(ticker)
-
-            # Flatten columns immediately after adding Sector
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = [col[0] if isinstance(col, tuple) else col for col in df.columns]
+            # The batch frame shares one index across tickers: drop rows this ticker lacks
+            df = batch.xs(symbol, axis=1, level=0).dropna(how="all")
 
-            prices[ticker] = df
+            df = _prepare_frame(ticker, df)
+            if df is not None:
+                prices[ticker] = df
 
         except Exception as e:
-            error(f"Error fetching data for {ticker}: {e}")
+            error(f"Error processing data for {ticker}: {e}")
 
     return prices
 
+def ensure_prices(tickers, period="5d", interval="1d"):
+    """
+    Fetch historical price data for each ticker, ensure 'Close' exists,
+    flatten columns if needed, and add a 'Sector' column.
 
+    Multiple tickers are downloaded in a single batched yfinance request;
+    a single ticker uses the per-ticker path.
 
-
-
-
-
-
-
-
-
-
-
+    Returns:
+        dict[ticker -> DataFrame] with flat column names
+    """
+    tickers = [str(t) for t in tickers]
+    if len(tickers) <= 1:
+        return _ensure_prices_serial(tickers, period, interval)
+    return _ensure_prices_batch(tickers, period, interval)
@@ -59,6 +59,7 @@ to be visible. On Windows, `colorama.init(autoreset=True)` ensures colors reset
 automatically after each message.
 """
 
+import sys
 from datetime import datetime
 from colorama import Fore, Style, init
 
@@ -68,6 +69,11 @@ init(autoreset=True)
 # Global verbosity flag
 _VERBOSE = False
 
+# Line templates with the color codes baked in once at import time
+_INFO_FMT = Fore.GREEN + "[%s][INFO]" + Style.RESET_ALL + " %s\n"
+_WARN_FMT = Fore.YELLOW + "[%s][WARN]" + Style.RESET_ALL + " %s\n"
+_ERROR_FMT = Fore.RED + "[%s][ERROR]" + Style.RESET_ALL + " %s\n"
+
 def set_verbose(value: bool) -> None:
     """Set global verbosity for logging."""
     global _VERBOSE
@@ -78,15 +84,14 @@ def _ts() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 def info(msg: str) -> None:
+    # Gate before any formatting work
     if _VERBOSE:
-        print(f"{Fore.GREEN}[{_ts()}][INFO]{Style.RESET_ALL} {msg}")
+        sys.stdout.write(_INFO_FMT % (_ts(), msg))
 
 def warn(msg: str) -> None:
     # Warnings always show
-    print(f"{Fore.YELLOW}[{_ts()}][WARN]{Style.RESET_ALL} {msg}")
+    sys.stdout.write(_WARN_FMT % (_ts(), msg))
 
 def error(msg: str) -> None:
     # Errors always show
-    print(f"{Fore.RED}[{_ts()}][ERROR]{Style.RESET_ALL} {msg}")
-
-
+    sys.stdout.write(_ERROR_FMT % (_ts(), msg))
@@ -7,16 +7,18 @@ performance statistics for portfolios or individual assets. It is designed to be
 imported into the Streamlit dashboard (`dashboard.py`) or used in offline analysis scripts.
 
 Functions included:
-- Value at Risk (VaR) and Conditional VaR (CVaR / Expected Shortfall)
+- Value at Risk (VaR) and Conditional VaR (CVaR / Expected Shortfall), separately or fused
 - Sharpe, Sortino, and Calmar ratios
+- All return-based metrics at once (`return_metrics`), sharing intermediate statistics
 - Maximum drawdown
 - Correlation matrix
 - Win rate, loss rate, and profit factor
 
 Robustness & Safety
 -------------------
-- All functions are pure and side-effect free: they take pandas Series/DataFrames as input
-  and return numeric results or DataFrames, making them easy to test and reuse.
+- All functions are pure and side-effect free: they take pandas Series/DataFrames (or plain
+  NumPy arrays for the return-based metrics) as input and return numeric results or
+  DataFrames, making them easy to test and reuse.
 - Empty or all-NaN inputs are handled gracefully, returning `np.nan` rather than raising errors.
 - Division-by-zero cases (e.g., zero standard deviation or zero max drawdown) are explicitly guarded.
 - Behaviour on insufficient data is predictable and safe for use in automated pipelines.
@@ -31,69 +33,168 @@ import numpy as np
 import pandas as pd
 
 
+def _valid(returns) -> np.ndarray:
+    """Return the non-NaN values of a Series or array-like as a float64 ndarray."""
+    arr = np.asarray(returns, dtype=np.float64)
+    nan_mask = np.isnan(arr)
+    # No copy on the common path (already float64, no NaNs)
+    return arr[~nan_mask] if nan_mask.any() else arr
+
+
+# --- Array kernels ---
+# Operate on clean (NaN-free, non-empty) float64 arrays; the public functions below
+# validate their input once and then call these, so no kernel re-validates.
+
+def _var_cvar_kernel(r: np.ndarray, confidence_level: float) -> tuple[float, float]:
+    """
+    VaR and CVaR from a single O(n) np.partition instead of a full sort.
+
+    VaR is the linearly interpolated percentile, identical to np.percentile;
+    CVaR is the mean of all returns <= VaR.
+    """
+    h = (r.size - 1) * (1 - confidence_level)
+    lo = int(np.floor(h))
+    hi = min(lo + 1, r.size - 1)
+    part = np.partition(r, (lo, hi))
+
+    # Same interpolation formula as NumPy's percentile
+    t = h - lo
+    a, b = part[lo], part[hi]
+    var = b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t
+
+    # Everything up to `lo` is <= var; beyond it only values tied with var qualify
+    rest = part[lo + 1:]
+    tie_mask = rest <= var
+    cvar = (part[:lo + 1].sum() + rest.sum(where=tie_mask)) / (lo + 1 + np.count_nonzero(tie_mask))
+    return float(var), float(cvar)
+
+
+def _sharpe_kernel(mean_excess: float, std_excess: float) -> float:
+    # Guard against zero or near-zero volatility
+    if std_excess < 1e-12:
+        return np.nan
+    return np.sqrt(252) * mean_excess / std_excess
+
+
+def _downside_std(excess: np.ndarray) -> float:
+    downside_mask = excess < 0  # use excess returns for downside risk
+    if not downside_mask.any():
+        return np.nan
+    # Masked reduction: no filtered copy of the negative returns
+    return float(excess.std(ddof=0, where=downside_mask))
+
+
+def _sortino_kernel(mean_excess: float, downside_std: float) -> float:
+    # Guard against no downside risk (NaN or near-zero std)
+    if np.isnan(downside_std) or downside_std < 1e-12:
+        return np.nan
+    return np.sqrt(252) * mean_excess / downside_std
+
+
+def _calmar_kernel(r: np.ndarray, n: int) -> float:
+    # Annualized over n, the input length including NaN rows (as before NaNs were dropped)
+    cumulative = np.cumprod(1 + r)
+    mdd = _max_drawdown_kernel(cumulative)
+    annual_return = cumulative[-1] ** (252 / n) - 1
+    return annual_return / abs(mdd) if mdd != 0 else np.nan
+
+
+def _win_loss_kernel(a: np.ndarray) -> tuple[int, int, float, float]:
+    """Win/loss counts and sums via masked reductions (no filtered copies; NaNs never match)."""
+    win_mask = a > 0
+    loss_mask = a < 0
+    return (
+        int(np.count_nonzero(win_mask)),
+        int(np.count_nonzero(loss_mask)),
+        float(a.sum(where=win_mask)),
+        float(a.sum(where=loss_mask)),
+    )
+
+
+def _max_drawdown_kernel(values: np.ndarray) -> float:
+    rolling_max = np.maximum.accumulate(values)
+    return float((values / rolling_max - 1).min())
+
+
 def calculate_var(returns: pd.Series, confidence_level: float = 0.95) -> float:
     """
     Calculate the Value at Risk (VaR) at the given confidence level.
     """
-    if returns.empty or returns.dropna().empty:
-        return np.nan
-    return np.percentile(returns.dropna(), (1 - confidence_level) * 100)
+    return var_and_cvar(returns, confidence_level)[0]
 
 
 def calculate_cvar(returns: pd.Series, confidence_level: float = 0.95) -> float:
     """
     Calculate the Conditional Value at Risk (CVaR) at the given confidence level.
     """
-    if returns.empty or returns.dropna().empty:
-        return np.nan
-    var = calculate_var(returns, confidence_level)
-    cvar_values = returns[returns <= var]
-    if cvar_values.empty:
-        return np.nan
-    return cvar_values.mean()
+    return var_and_cvar(returns, confidence_level)[1]
 
 
-def sharpe_ratio(returns: pd.Series, risk_free_rate: float = 0.0) -> float:
-    """Calculate the annualized Sharpe ratio."""
-    if returns.empty or returns.dropna().empty:
-        return np.nan
+def var_and_cvar(returns: pd.Series, confidence_level: float = 0.95) -> tuple[float, float]:
+    """
+    Calculate VaR and CVaR together from one partition of the returns.
 
-    excess = returns - (risk_free_rate / 252)
-    std_excess = excess.std(ddof=0)
+    Prefer this over separate calculate_var/calculate_cvar calls when both are needed.
+    """
+    r = _valid(returns)
+    if r.size == 0:
+        return np.nan, np.nan
+    return _var_cvar_kernel(r, confidence_level)
 
-    # Guard against zero or near-zero volatility
-    if std_excess < 1e-12:
+
+def sharpe_ratio(returns: pd.Series, risk_free_rate: float = 0.0) -> float:
+    """Calculate the annualized Sharpe ratio."""
+    r = _valid(returns)
+    if r.size == 0:
         return np.nan
 
-    return np.sqrt(252) * excess.mean() / std_excess
+    excess = r - (risk_free_rate / 252)
+    return _sharpe_kernel(excess.mean(), excess.std(ddof=0))
 
 
 def sortino_ratio(returns: pd.Series, risk_free_rate: float = 0.0) -> float:
     """Calculate the annualized Sortino ratio."""
-    if returns.empty or returns.dropna().empty:
+    r = _valid(returns)
+    if r.size == 0:
         return np.nan
 
-    excess = returns - (risk_free_rate / 252)
-    downside = excess[excess < 0]  # use excess returns for downside risk
-    downside_std = downside.std(ddof=0)
-
-    # Guard against no downside risk (NaN or near-zero std)
-    if pd.isna(downside_std) or downside_std < 1e-12:
-        return np.nan
-
-    return np.sqrt(252) * excess.mean() / downside_std
+    excess = r - (risk_free_rate / 252)
+    return _sortino_kernel(excess.mean(), _downside_std(excess))
 
 
 def calmar_ratio(returns: pd.Series) -> float:
     """Calculate the Calmar ratio: annualized return divided by max drawdown."""
-    if returns.empty or returns.dropna().empty:
-        return np.nan
-    cumulative = (1 + returns).cumprod()
-    mdd = max_drawdown(cumulative)
-    if len(returns) == 0:
+    r = _valid(returns)
+    if r.size == 0:
         return np.nan
-    annual_return = (1 + returns).prod() ** (252 / len(returns)) - 1
-    return annual_return / abs(mdd) if mdd != 0 else np.nan
+    return _calmar_kernel(r, np.size(returns))
+
+
+def return_metrics(returns: pd.Series, risk_free_rate: float = 0.0,
+                   confidence_level: float = 0.95) -> dict:
+    """
+    Compute VaR, CVaR, Sharpe, Sortino and Calmar from one returns series.
+
+    The input is validated once and the shared statistics (excess returns, their
+    mean, std and downside std) are computed once, instead of once per metric.
+    Results match the individual functions.
+    """
+    r = _valid(returns)
+    if r.size == 0:
+        return {"var": np.nan, "cvar": np.nan, "sharpe": np.nan,
+                "sortino": np.nan, "calmar": np.nan}
+
+    excess = r - (risk_free_rate / 252)
+    mean_excess = excess.mean()
+    var, cvar = _var_cvar_kernel(r, confidence_level)
+
+    return {
+        "var": var,
+        "cvar": cvar,
+        "sharpe": _sharpe_kernel(mean_excess, excess.std(ddof=0)),
+        "sortino": _sortino_kernel(mean_excess, _downside_std(excess)),
+        "calmar": _calmar_kernel(r, np.size(returns))
+    }
 
 def max_drawdown(cumulative_returns: pd.Series) -> float:
     """
@@ -101,7 +202,7 @@ def max_drawdown(cumulative_returns: pd.Series) -> float:
 
     Parameters
     ----------
-    cumulative_returns : pd.Series
+    cumulative_returns : pd.Series or np.ndarray
         Series of cumulative returns (e.g., equity curve).
 
     Returns
@@ -109,9 +210,10 @@ def max_drawdown(cumulative_returns: pd.Series) -> float:
     float
         Maximum drawdown as a decimal (negative means loss).
     """
-    rolling_max = cumulative_returns.cummax()
-    drawdown = cumulative_returns / rolling_max - 1
-    return drawdown.min()
+    values = _valid(cumulative_returns)
+    if values.size == 0:
+        return np.nan
+    return _max_drawdown_kernel(values)
 
 def correlation_matrix(price_df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -127,23 +229,33 @@ def correlation_matrix(price_df: pd.DataFrame) -> pd.DataFrame:
     pd.DataFrame
         Correlation matrix of returns.
     """
-    returns = price_df.pct_change().dropna()
-    return returns.corr()
+    columns = price_df.columns
+    prices = price_df.to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(prices, axis=0) / prices[:-1]
+        returns = returns[~np.isnan(returns).any(axis=1)]  # same rows as .dropna()
+        if returns.shape[0] < 2:
+            corr = np.full((len(columns), len(columns)), np.nan)
+        else:
+            # One BLAS-backed pass instead of pandas' per-column-pair loop
+            corr = np.atleast_2d(np.corrcoef(returns, rowvar=False))
+    return pd.DataFrame(corr, index=columns, columns=columns)
 
 def win_loss_stats(pnl_series: pd.Series) -> dict:
-    wins = pnl_series[pnl_series > 0]
-    losses = pnl_series[pnl_series < 0]
+    a = np.asarray(pnl_series, dtype=np.float64)
+    n_wins, n_losses, wins_sum, losses_sum = _win_loss_kernel(a)
 
-    win_rate = len(wins) / len(pnl_series) if len(pnl_series) > 0 else np.nan
-    loss_rate = len(losses) / len(pnl_series) if len(pnl_series) > 0 else np.nan
+    # Rates are over all observations (NaNs included), as before
+    win_rate = n_wins / a.size if a.size > 0 else np.nan
+    loss_rate = n_losses / a.size if a.size > 0 else np.nan
 
-    if losses.sum() == 0:
-        if wins.sum() > 0:
+    if losses_sum == 0:
+        if wins_sum > 0:
             profit_factor = np.inf   # all wins, no losses
         else:
             profit_factor = np.nan   # no wins and no losses (all zeros)
     else:
-        profit_factor = wins.sum() / abs(losses.sum())
+        profit_factor = wins_sum / abs(losses_sum)
 
     return {
         "win_rate": win_rate,
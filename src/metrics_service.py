@@ -2,31 +2,49 @@
 """
 Metrics Service
 ================
-This module provides functions to compute various financial metrics for a portfolio based on its profit and loss (PnL) data.
+This module provides functions to compute various financial metrics for a portfolio from its
+wide price panel (one column per ticker, see `pnl_calc.build_price_panel`) and the quantity
+held of each ticker: `compute_portfolio_metrics(price_wide, quantities, include_correlation)`.
 """
+import numpy as np
 import pandas as pd
-from metrics import (calculate_var, calculate_cvar, sharpe_ratio, sortino_ratio, calmar_ratio, max_drawdown, correlation_matrix)
+from metrics import (return_metrics, max_drawdown, correlation_matrix)
 
-def compute_portfolio_metrics(pnl_df: pd.DataFrame) -> dict:
-    if pnl_df is None or pnl_df.empty:
+def compute_portfolio_metrics(price_wide: pd.DataFrame, quantities: dict[str, float],
+                              include_correlation: bool = True) -> dict:
+    """
+    price_wide: prices indexed by Time with one column per ticker (see pnl_calc.build_price_panel)
+    quantities: dict mapping ticker -> quantity held
+    include_correlation: set False when the caller computes (and caches) the
+        correlation matrix itself
+    """
+    if price_wide is None or price_wide.empty:
         return {}
 
-    # Get the total portfolio market value for each time step.
-    portfolio_value_series = pnl_df.groupby("Time")["Position Value ($)"].sum()
+    # Get the total portfolio market value for each time step: a row sum over the
+    # aligned panel (missing bars are skipped, as a groupby("Time").sum() would).
+    qty_vec = np.array([quantities.get(t, 0) for t in price_wide.columns], dtype=np.float64)
+    values = np.nansum(price_wide.to_numpy(dtype=np.float64) * qty_vec, axis=1)
 
-    # 2. Calculate Portfolio Returns (required for all ratios and VaR/CVaR)
-    # Returns are the percentage change of the *total portfolio value*.
-    returns = portfolio_value_series.pct_change().dropna()
+    # Calculate Portfolio Returns (required for all ratios and VaR/CVaR)
+    # Returns are the percentage change of the *total portfolio value*,
+    # computed on the raw array to skip pct_change's intermediate frames.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(values) / values[:-1]
+    # Drop the 0/0 steps, as pct_change().dropna() did: Calmar annualizes over the length
+    returns = returns[~np.isnan(returns)]
 
-    # 3. Prepare Price Data for Correlation Matrix
-    price_wide = pnl_df.pivot(index="Time", columns="Ticker", values="Price")
+    # Validate the returns once and share mean/std/partition across the ratios
+    stats = return_metrics(returns, confidence_level=0.95)
 
-    return {
-        "VaR (95%)": calculate_var(returns),
-        "CVaR (95%)": calculate_cvar(returns),
-        "Sharpe": sharpe_ratio(returns),
-        "Sortino": sortino_ratio(returns),
-        "Calmar": calmar_ratio(returns),
-        "Max Drawdown": max_drawdown(portfolio_value_series), # Max Drawdown often takes the value series itself
-        "Correlation Matrix": correlation_matrix(price_wide)
-    }
\ No newline at end of file
+    metrics = {
+        "VaR (95%)": stats["var"],
+        "CVaR (95%)": stats["cvar"],
+        "Sharpe": stats["sharpe"],
+        "Sortino": stats["sortino"],
+        "Calmar": stats["calmar"],
+        "Max Drawdown": max_drawdown(values), # Max Drawdown often takes the value series itself
+    }
+    if include_correlation:
+        metrics["Correlation Matrix"] = correlation_matrix(price_wide)
+    return metrics
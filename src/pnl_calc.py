@@ -1,33 +1,58 @@
 # src/pnl_calc.py
+import numpy as np
 import pandas as pd
 
-def calculate_pnl(price_data: dict[str, pd.DataFrame], quantities: dict[str, float]) -> pd.DataFrame:
+def build_price_panel(price_data: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Stack the 'Close' column of each non-empty frame into a wide panel:
+    a sorted Time index with one column per ticker. Tickers with different
+    bar sets are aligned on the union of timestamps (missing bars are NaN).
+    """
+    closes = {t: df["Close"] for t, df in price_data.items() if df is not None and not df.empty}
+    if not closes:
+        return pd.DataFrame()
+    return pd.concat(closes, axis=1).sort_index()
+
+def first_last_prices(prices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    First and last non-NaN value of each column of a (T, N) price matrix.
+    """
+    valid = ~np.isnan(prices)
+    cols = np.arange(prices.shape[1])
+    first = valid.argmax(axis=0)
+    last = prices.shape[0] - 1 - valid[::-1].argmax(axis=0)
+    return prices[first, cols], prices[last, cols]
+
+def calculate_pnl(price_data: dict[str, pd.DataFrame], quantities: dict[str, float],
+                  panel: pd.DataFrame | None = None) -> pd.DataFrame:
     """
     Compute PnL for each ticker given price history and quantities.
     price_data: dict mapping ticker -> DataFrame with 'Close' column
     quantities: dict mapping ticker -> quantity held
+    panel: optional prebuilt build_price_panel(price_data), to skip rebuilding it
     Returns a DataFrame with PnL and percentage change for each ticker.
-    
+
     """
-    results = []
-    for ticker, df in price_data.items():
-        if df is None or df.empty:
-            continue
-        try:
-            start = df["Close"].iloc[0]
-            end = df["Close"].iloc[-1]
-            qty = quantities.get(ticker, 0)
-            pnl = (end - start) * qty
-            pct = ((end - start) / start) * 100 if start else 0.0
-            results.append({
-                "Ticker": ticker,
-                "Quantity": qty,
-                "Start Price": start,
-                "End Price": end,
-                "PnL ($)": pnl,
-                "Change (%)": pct,
-                "Position Value ($)": end * qty
-            })
-        except Exception as e:
-            print(f"Error calculating PnL for {ticker}: {e}")
-    return pd.DataFrame(results)
+    if panel is None:
+        panel = build_price_panel(price_data)
+    if panel.empty:
+        return pd.DataFrame()
+
+    # One (T, N) matrix: start/end are its first/last valid rows per column
+    tickers = list(panel.columns)
+    starts, ends = first_last_prices(panel.to_numpy(dtype=np.float64))
+    qtys = np.array([quantities.get(t, 0) for t in tickers])
+
+    diff = ends - starts
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(starts != 0, diff / starts * 100, 0.0)
+
+    return pd.DataFrame({
+        "Ticker": tickers,
+        "Quantity": qtys,
+        "Start Price": starts,
+        "End Price": ends,
+        "PnL ($)": diff * qtys,
+        "Change (%)": pct,
+        "Position Value ($)": ends * qtys
+    })
@@ -2,30 +2,73 @@
 import streamlit as st
 import pandas as pd
 from ensure_data import ensure_prices
+from pnl_calc import build_price_panel
 
 DEFAULT_PORTFOLIO = pd.DataFrame({
     "Ticker": ["NVDA", "MSFT", "GOOGL"],
     "Quantity": [100, 30, 70]
 })
 
+# Allowed intervals per period, and the index of each period's default interval
+# (30m for intraday, 1d otherwise), built once at import
+_INTERVAL_MAP = {
+    "1d": ["1m", "5m", "15m", "30m", "1h"],
+    "5d": ["5m", "15m", "30m", "1h", "1d"],
+    "1mo": ["15m", "30m", "1h", "1d", "1wk"],
+    "3mo": ["15m", "30m", "1h", "1d", "1wk"],
+    "6mo": ["1d", "1wk", "1mo"],
+    "1y": ["1d", "1wk", "1mo"],
+    "ytd": ["1d", "1wk", "1mo"],
+    "max": ["1d", "1wk", "1mo"]
+}
+
+def _default_interval_index(period, options):
+    default = "30m" if period == "1d" else "1d"
+    return options.index(default) if default in options else 0
+
+_DEFAULT_INTERVAL_INDEX = {
+    period: _default_interval_index(period, options)
+    for period, options in _INTERVAL_MAP.items()
+}
+
+class _IncompleteFetch(Exception):
+    """Raised by _fetch_prices when some tickers came back without data."""
+    def __init__(self, data):
+        super().__init__("incomplete price data")
+        self.data = data
+
+@st.cache_data(ttl=300, max_entries=32, show_spinner="Fetching market data...")
+def _fetch_prices(tickers_tuple, period, interval):
+    """Cached wrapper around ensure_prices, keyed on (tickers, period, interval).
+
+    ensure_prices swallows download errors and returns what it got; a partial or
+    empty result is raised instead of returned so it is not cached (Streamlit
+    does not cache exceptions) and the next fetch retries.
+    """
+    data = ensure_prices(list(tickers_tuple), period, interval)
+    if any(t not in data for t in tickers_tuple):
+        raise _IncompleteFetch(data)
+    return data
+
+def _load_prices(tickers, period, interval):
+    """Fetch prices through the cache, falling back to an uncached partial result."""
+    try:
+        return _fetch_prices(_tickers_key(tickers), period, interval)
+    except _IncompleteFetch as e:
+        return e.data
+
+def _tickers_key(tickers):
+    """Canonical, hashable cache key: sorted unique non-empty tickers."""
+    return tuple(sorted({t for t in tickers if t}))
+
+def _set_data(data):
+    """Store fetched prices together with their wide Close panel, built once per fetch."""
+    st.session_state.data = data
+    st.session_state.price_wide = build_price_panel(data)
+
 def get_interval_settings(period):
     """Return allowed intervals and default index based on selected period."""
-    interval_map = {
-        "1d": ["1m", "5m", "15m", "30m", "1h"],
-        "5d": ["5m", "15m", "30m", "1h", "1d"],
-        "1mo": ["15m", "30m", "1h", "1d", "1wk"],
-        "3mo": ["15m", "30m", "1h", "1d", "1wk"],
-        "6mo": ["1d", "1wk", "1mo"],
-        "1y": ["1d", "1wk", "1mo"],
-        "ytd": ["1d", "1wk", "1mo"],
-        "max": ["1d", "1wk", "1mo"]
-    }
-    options = interval_map.get(period, ["1d"])
-    if period == "1d":
-        default_index = options.index("30m") if "30m" in options else 0
-    else:
-        default_index = options.index("1d") if "1d" in options else 0
-    return options, default_index
+    return _INTERVAL_MAP.get(period, ["1d"]), _DEFAULT_INTERVAL_INDEX.get(period, 0)
 
 def init_state():
     """Initialize session state with defaults if not already set."""
@@ -39,7 +82,7 @@ def init_state():
         st.session_state.active_quantities = quantities
         st.session_state.active_period = "1mo"
         st.session_state.active_interval = "1d"
-        st.session_state.data = ensure_prices(tickers, "1mo", "1d")
+        _set_data(_load_prices(tickers, "1mo", "1d"))
 
 def update_state(portfolio_df, period, interval):
     """Update session state when user changes sidebar inputs."""
@@ -52,4 +95,4 @@ def update_state(portfolio_df, period, interval):
     st.session_state.active_quantities = quantities
     st.session_state.active_period = period
     st.session_state.active_interval = interval
-    st.session_state.data = ensure_prices(tickers, period, interval)
+    _set_data(_load_prices(tickers, period, interval))
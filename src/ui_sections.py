@@ -1,10 +1,231 @@
 # src/ui_sections.py    
+import io
+from dataclasses import dataclass
 import streamlit as st
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import altair as alt
+import matplotlib
 import plotly.express as px
 import plotly.graph_objects as go
+from metrics import correlation_matrix
 from metrics_service import compute_portfolio_metrics
+from pnl_calc import build_price_panel, first_last_prices
+
+# Above this many (Time, Ticker) points the PnL chart switches from Altair (SVG)
+# to Plotly WebGL traces, which keep the browser responsive on long histories.
+WEBGL_ROW_THRESHOLD = 10_000
+_CHART_COLUMNS = ["Time", "Ticker", "PnL"]
+
+# Narrower dtypes for display/export frames (halves the Arrow/CSV payload).
+# Prices and dollar amounts stay float64, rounded to cents: float32 cannot hold
+# cents exactly above ~$131k, e.g. 700,123.47 would render as 700,123.50.
+_PNL_DISPLAY_DTYPES = {
+    "Quantity": "int32",
+    "Change (%)": "float32",
+}
+_PNL_PRICE_COLS = ["Start Price", "End Price"]
+
+# Bounds for the caches below. Their keys are price data that turns over with every
+# refetch (state_manager._fetch_prices has ttl=300), so entries expire on the same
+# schedule; figures are process-global objects, so fewer of them are kept.
+_CACHE_TTL = 300
+_CACHE_ENTRIES = 32
+_CSV_CACHE_ENTRIES = 16  # one entry per export filter combination
+_FIGURE_CACHE_ENTRIES = 8
+
+# Styler formats and colored columns, built once at import instead of per rerun
+_PNL_FMT = {
+    "Quantity": "{:,.0f}",
+    "Start Price": "{:,.2f}",
+    "End Price": "{:,.2f}",
+    "PnL ($)": "{:,.2f}",
+    "Change (%)": "{:,.2f}",
+    "Position Value ($)": "{:,.2f}",
+}
+_PNL_COLOR_COLS = ["PnL ($)", "Change (%)"]
+_DISPLAY_FMT = {
+    "Quantity": "{:,.0f}",
+    "Price": "{:,.2f}",
+    "PnL": "{:,.2f}",
+    "Position Value ($)": "{:,.2f}"
+}
+
+
+def _color_pos_neg(col: pd.Series) -> np.ndarray:
+    """CSS text color per cell: green for gains, red for losses (one vectorized pass)."""
+    values = col.to_numpy()
+    return np.where(values > 0, "color: green", np.where(values < 0, "color: red", ""))
+
+
+@st.cache_data(ttl=_CACHE_TTL, max_entries=_CACHE_ENTRIES, show_spinner=False)
+def _pnl_table_frames(pnl_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """PnL table sorted by descending PnL ($) in display dtypes, and the CSS for its
+    colored columns. Cached on the PnL frame, so reruns skip the sort, cast and
+    color pass."""
+    df_sorted = (
+        pnl_df.sort_values(by="PnL ($)", ascending=False)
+        .reset_index(drop=True)
+        .astype(_PNL_DISPLAY_DTYPES)
+    )
+    df_sorted[_PNL_PRICE_COLS] = df_sorted[_PNL_PRICE_COLS].round(2)
+    css = pd.DataFrame(
+        {col: _color_pos_neg(df_sorted[col]) for col in _PNL_COLOR_COLS},
+        index=df_sorted.index
+    )
+    return df_sorted, css
+
+
+@st.cache_data(ttl=_CACHE_TTL, max_entries=_CACHE_ENTRIES, show_spinner=False)
+def _cached_correlation(closes_bytes: bytes, shape: tuple, columns: tuple) -> pd.DataFrame:
+    """Correlation matrix of the wide price panel, keyed on its raw bytes so
+    widget-only reruns skip the O(T·K²) computation."""
+    prices = np.frombuffer(closes_bytes, dtype=np.float64).reshape(shape)
+    return correlation_matrix(pd.DataFrame(prices, columns=list(columns)))
+
+
+@st.cache_data(ttl=_CACHE_TTL, max_entries=_CACHE_ENTRIES, show_spinner=False)
+def _corr_gradient_css(corr_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-cell CSS matching Styler.background_gradient(cmap="coolwarm", vmin=-1, vmax=1):
+    one vectorized colormap and luminance pass, cached on the matrix.
+    """
+    rgb = matplotlib.colormaps["coolwarm"]((corr_df.to_numpy(dtype=np.float64) + 1) / 2)[..., :3]
+
+    # W3C relative luminance decides between light and dark text, as pandas does
+    lin = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    dark = 0.2126 * lin[..., 0] + 0.7152 * lin[..., 1] + 0.0722 * lin[..., 2] < 0.408
+
+    rgb8 = np.rint(rgb * 255).astype(int)
+    css = [
+        f"background-color: #{r:02x}{g:02x}{b:02x};color: {'#f1f1f1' if d else '#000000'};"
+        for (r, g, b), d in zip(rgb8.reshape(-1, 3).tolist(), dark.ravel().tolist())
+    ]
+    return pd.DataFrame(
+        np.array(css, dtype=object).reshape(corr_df.shape),
+        index=corr_df.index,
+        columns=corr_df.columns
+    )
+
+
+@st.cache_data(ttl=_CACHE_TTL, max_entries=_CACHE_ENTRIES, show_spinner=False)
+def _cached_portfolio_metrics(closes_wide: pd.DataFrame, quantities: dict) -> dict:
+    """compute_portfolio_metrics without the correlation matrix (cached separately),
+    memoized on the panel and quantities so widget reruns skip the reductions."""
+    return compute_portfolio_metrics(closes_wide, quantities, include_correlation=False)
+
+
+@st.cache_data(ttl=_CACHE_TTL, max_entries=_CSV_CACHE_ENTRIES, show_spinner=False)
+def _encode_csv(df: pd.DataFrame) -> bytes:
+    """CSV bytes for the download button, written by pyarrow's C++ CSV writer.
+    Cached on the frame's contents, so reruns with unchanged filters skip encoding."""
+    buf = io.BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+    return buf.getvalue()
+
+
+@dataclass
+class PortfolioBundle:
+    """Per-portfolio arrays shared by the chart, allocation, metrics and export sections."""
+    combined_df: pd.DataFrame  # long form (Time, Ticker, ...) for the chart and export table
+    prices: np.ndarray         # (T, K) float64 closes, aligned with the panel
+    pnl_wide: np.ndarray       # (T, K) PnL against each ticker's first valid close
+    last_prices: np.ndarray    # (K,) last valid close per ticker
+    qty_vec: np.ndarray        # (K,) quantities aligned with the panel columns
+
+
+@st.cache_data(ttl=_CACHE_TTL, max_entries=_CACHE_ENTRIES, show_spinner=False)
+def _build_bundle(closes_wide: pd.DataFrame, qtys: tuple) -> PortfolioBundle:
+    """
+    Build the PortfolioBundle for a wide Close panel and the quantities aligned
+    with its columns.
+
+    Cached on both, so reruns with unchanged inputs skip the build.
+    """
+    tickers = closes_wide.columns
+    qty_vec = np.array(qtys)
+
+    prices = closes_wide.to_numpy(dtype=np.float64)
+    baseline, last_prices = first_last_prices(prices)  # first/last valid price per ticker
+    pos_wide = prices * qty_vec
+    pnl_wide = (prices - baseline) * qty_vec
+
+    # Long form only for the chart and the export table. Raveling the wide
+    # matrices row-major keeps it sorted by Time (needed for searchsorted filters);
+    # Ticker is categorical so isin/unique work on int codes, not strings.
+    # Missing bars are masked out of the flat arrays before the frame is built,
+    # so each column is allocated once.
+    n_t, n_k = prices.shape
+    flat_prices = prices.ravel()
+    valid = ~np.isnan(flat_prices)
+    combined_df = pd.DataFrame({
+        "Time": closes_wide.index.repeat(n_k)[valid],
+        "Ticker": pd.Categorical.from_codes(np.tile(np.arange(n_k), n_t)[valid], categories=tickers),
+        "Quantity": np.tile(qty_vec, n_t)[valid],
+        "Price": flat_prices[valid],
+        "Position Value ($)": pos_wide.ravel()[valid],
+        "PnL": pnl_wide.ravel()[valid],
+    })
+    return PortfolioBundle(combined_df, prices, pnl_wide, last_prices, qty_vec)
+
+
+# --- Cached Plotly figures ---
+# cache_resource hands back the same Figure object on reruns with unchanged inputs,
+# skipping figure construction (no pickling copy as with cache_data).
+
+@st.cache_resource(ttl=_CACHE_TTL, max_entries=_FIGURE_CACHE_ENTRIES, show_spinner=False)
+def _ticker_pie_figure(labels: tuple, values: tuple) -> go.Figure:
+    fig = px.pie(
+        pd.DataFrame({"Ticker": labels, "Position Value ($)": values}),
+        names="Ticker",
+        values="Position Value ($)",
+        title="Portfolio Allocation by Ticker",
+        hole=0.3
+    )
+    fig.update_traces(textposition="inside", textinfo="percent+label")
+    fig.update_layout(showlegend=False, title_x=0.3)
+    return fig
+
+
+@st.cache_resource(ttl=_CACHE_TTL, max_entries=_FIGURE_CACHE_ENTRIES, show_spinner=False)
+def _pnl_webgl_figure(pnl_wide: pd.DataFrame) -> go.Figure:
+    fig = go.Figure([
+        go.Scattergl(x=pnl_wide.index, y=pnl_wide[t].to_numpy(), mode="lines", name=str(t))
+        for t in pnl_wide.columns
+    ])
+    fig.update_layout(
+        height=400,
+        xaxis_title="Time",
+        yaxis_title="PnL ($)",
+        legend_title_text="Ticker"
+    )
+    return fig
+
+
+@st.cache_resource(ttl=_CACHE_TTL, max_entries=_FIGURE_CACHE_ENTRIES, show_spinner=False)
+def _sector_pie_figure(labels: tuple, values: tuple) -> go.Figure:
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                labels=list(labels),
+                values=list(values),
+                hole=0.3,
+                textinfo="percent+label",
+                textposition="inside",
+                hoverinfo="skip"
+            )
+        ]
+    )
+    fig.update_layout(
+        title="Portfolio Allocation by Sector",
+        showlegend=False,
+        title_x=0.3,
+        margin=dict(l=10, r=10, t=60, b=10)
+    )
+    return fig
+
 
 def render_pnl_table(pnl_df: pd.DataFrame):
     """Render the Per-Ticker PnL table without numeric index,
@@ -16,25 +237,13 @@ def render_pnl_table(pnl_df: pd.DataFrame):
         st.info("No PnL data available.")
         return
 
-    # Sort by PnL descending
-    df_sorted = pnl_df.sort_values(by="PnL ($)", ascending=False).reset_index(drop=True)
+    df_sorted, css = _pnl_table_frames(pnl_df)
 
-    # Apply styling: green for positive, red for negative
+    # Apply styling: green for positive, red for negative (precomputed CSS)
     styled_df = (
         df_sorted.style
-        .map(
-            lambda v: "color: green" if isinstance(v, (int, float)) and v > 0
-            else ("color: red" if isinstance(v, (int, float)) and v < 0 else ""),
-            subset=["PnL ($)", "Change (%)"]
-        )
-        .format({
-            "Quantity": "{:,.0f}",
-            "Start Price": "{:,.2f}",
-            "End Price": "{:,.2f}",
-            "PnL ($)": "{:,.2f}",
-            "Change (%)": "{:,.2f}",
-            "Position Value ($)": "{:,.2f}",
-        })
+        .apply(lambda _: css, axis=None, subset=_PNL_COLOR_COLS)
+        .format(_PNL_FMT)
     )
 
     # Render without index
@@ -59,18 +268,10 @@ def render_portfolio_summary(df_pnl: pd.DataFrame):
         total_value_pie = pie_df["Position Value ($)"].sum()
 
         if not pie_df.empty and total_value_pie > 0:
-            pie_df["Percentage"] = (pie_df["Position Value ($)"] / total_value_pie) * 100
-
-            fig = px.pie(
-                pie_df,
-                names="Ticker",
-                values="Position Value ($)",
-                title="Portfolio Allocation by Ticker",
-                hole=0.3
+            fig = _ticker_pie_figure(
+                tuple(pie_df["Ticker"]),
+                tuple(pie_df["Position Value ($)"])
             )
-
-            fig.update_traces(textposition="inside", textinfo="percent+label")
-            fig.update_layout(showlegend=False, title_x=0.3)
             # Use use_container_width=True to avoid the keyword argument deprecation warning
             st.plotly_chart(fig, use_container_width=True) 
         else:
@@ -78,7 +279,7 @@ def render_portfolio_summary(df_pnl: pd.DataFrame):
 
 
 
-def render_block(price_data: dict, quantities: dict) -> None:
+def render_block(price_data: dict, quantities: dict, closes_wide: pd.DataFrame | None = None) -> None:
     """
     Render portfolio PnL over time chart.
 
@@ -88,33 +289,30 @@ def render_block(price_data: dict, quantities: dict) -> None:
         Mapping of ticker -> DataFrame with 'Close' column (and DateTimeIndex).
     quantities : dict
         Mapping of ticker -> quantity held.
+    closes_wide : pd.DataFrame, optional
+        Prebuilt build_price_panel(price_data); built here if not given.
     """
     st.subheader("📉 Portfolio PnL Over Time")
-    pnl_time_data = []
-
-    for ticker, df in price_data.items():
-        if df is not None and not df.empty:
-            try:
-                tmp = df.copy()
-                qty = quantities.get(ticker, 0)
-                tmp["Quantity"] = qty
-                tmp["Price"] = tmp["Close"]
-                tmp["Position Value ($)"] = tmp["Price"] * tmp["Quantity"]
-                tmp["PnL"] = (tmp["Price"] - tmp["Price"].iloc[0]) * tmp["Quantity"]
-                tmp["Ticker"] = ticker
-                tmp["Time"] = tmp.index
-                pnl_time_data.append(
-                    tmp[["Time", "Ticker", "Quantity", "Price",
-                         "Position Value ($)", "PnL"]]
-                )
-            except Exception as e:
-                st.warning(f"{ticker}: Error building time series - {e}")
-
-    if pnl_time_data:
-        combined_df = pd.concat(pnl_time_data, ignore_index=True)
-        
+
+    # Wide (SoA) layout: one Close column per ticker, indexed by Time
+    if closes_wide is None:
+        closes_wide = build_price_panel(price_data)
+    if closes_wide.empty:
+        return
+
+    tickers = closes_wide.columns
+    bundle = _build_bundle(closes_wide, tuple(quantities.get(t, 0) for t in tickers))
+    combined_df = bundle.combined_df
+
+    if len(combined_df) > WEBGL_ROW_THRESHOLD:
+        # Large series: one WebGL trace per ticker instead of an SVG path per point
+        fig = _pnl_webgl_figure(pd.DataFrame(bundle.pnl_wide, index=closes_wide.index, columns=tickers))
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        # Embed only the encoded columns: the chart's data is inlined in the
+        # Vega-Lite spec sent to the browser on every rerun
         chart = (
-            alt.Chart(combined_df)
+            alt.Chart(combined_df[_CHART_COLUMNS])
             .mark_line()
             .encode(
                 x=alt.X("Time:T", title="Time"),
@@ -124,62 +322,58 @@ def render_block(price_data: dict, quantities: dict) -> None:
             .properties(width="container", height=400)
         )
         st.altair_chart(chart, use_container_width=True)
-        render_portfolio_allocation(price_data, quantities)
-
-        # Rendering others:
-        metrics = compute_portfolio_metrics(combined_df)
-        render_advanced_metrics(combined_df, metrics)
-        render_editable_table(combined_df)
 
-def render_portfolio_allocation(price_data: dict[str, pd.DataFrame],
-                                quantities: dict[str, int]) -> None:
+    # Sector allocation from the same panel: last valid close per ticker × quantity.
+    # Sector is constant per frame: read its first element off the array, not via .iloc
+    sectors = [
+        price_data[t]["Sector"].to_numpy()[0] if "Sector" in price_data[t].columns else "Unknown"
+        for t in tickers
+    ]
+    render_portfolio_allocation(tickers, sectors, bundle.last_prices * bundle.qty_vec)
+
+    # Rendering others:
+    metrics = _cached_portfolio_metrics(closes_wide, quantities)
+    metrics["Correlation Matrix"] = _cached_correlation(
+        bundle.prices.tobytes(), bundle.prices.shape, tuple(tickers)
+    )
+    render_advanced_metrics(metrics, closes_wide)
+    render_editable_table(combined_df)
+
+def render_portfolio_allocation(tickers: pd.Index,
+                                sectors: list[str],
+                                position_values: np.ndarray) -> None:
+        """
+        Render the sector allocation pie and sector-to-tickers table.
+
+        Parameters
+        ----------
+        tickers, sectors, position_values
+            Aligned per-ticker labels, sectors and latest position values.
+        """
         st.subheader("📊 Portfolio Allocation by Sector")
-        latest_data = []
-        for ticker, df in st.session_state.data.items():
-            if df is not None and not df.empty:
-                latest_close = df["Close"].iloc[-1]
-                qty = quantities.get(ticker, 0)
-                sector = df["Sector"].iloc[0] if "Sector" in df.columns and not df["Sector"].empty else "Unknown"
-                position_value = latest_close * qty
-                latest_data.append({
-                    "Ticker": ticker,
-                    "Sector": sector,
-                    "PositionValue": position_value
-                })
-
-        if latest_data:
-            sector_df = pd.DataFrame(latest_data)
-
-            sector_alloc = (
-                sector_df.groupby("Sector")
-                .agg({
-                    "PositionValue": "sum",
-                    "Ticker": lambda s: ", ".join(sorted(set(s)))
-                })
-                .reset_index()
-            )
 
-            total_val = sector_alloc["PositionValue"].sum()
-            sector_alloc["Percentage"] = (sector_alloc["PositionValue"] / total_val) * 100
-
-            fig_sector = go.Figure(
-                data=[
-                    go.Pie(
-                        labels=sector_alloc["Sector"],
-                        values=sector_alloc["PositionValue"],
-                        hole=0.3,
-                        textinfo="percent+label",
-                        textposition="inside",
-                        hoverinfo="skip"
-                    )
-                ]
+        if len(tickers):
+            # Sorted sector codes, then one bincount for the per-sector totals
+            # (NaN values count as 0, as in a groupby sum)
+            codes, labels = pd.factorize(np.asarray(sectors, dtype=object), sort=True)
+            totals = np.bincount(
+                codes,
+                weights=np.nan_to_num(position_values, nan=0.0),
+                minlength=len(labels)
             )
-
-            fig_sector.update_layout(
-                title="Portfolio Allocation by Sector",
-                showlegend=False,
-                title_x=0.3,
-                margin=dict(l=10, r=10, t=60, b=10)
+            members = [[] for _ in labels]
+            for ticker, code in zip(tickers, codes):
+                members[code].append(ticker)
+
+            sector_alloc = pd.DataFrame({
+                "Sector": labels,
+                "PositionValue": totals,
+                "Ticker": [", ".join(sorted(m)) for m in members]
+            })
+
+            fig_sector = _sector_pie_figure(
+                tuple(sector_alloc["Sector"]),
+                tuple(sector_alloc["PositionValue"])
             )
 
             # Use use_container_width=True
@@ -195,9 +389,14 @@ def render_portfolio_allocation(price_data: dict[str, pd.DataFrame],
         else:
             st.info("No data available for sector allocation chart.")
 
-def render_advanced_metrics(combined_df: pd.DataFrame, metrics: dict) -> None:
+def render_advanced_metrics(metrics: dict, price_wide: pd.DataFrame | None = None) -> None:
+    """
+    Render the ratio metrics and the asset correlation matrix.
+
+    price_wide (Time × Ticker prices) is only used when `metrics` carries no
+    precomputed "Correlation Matrix".
+    """
     st.subheader("📊 Advanced Metrics")
-    portfolio_values = combined_df.groupby("Time")["Position Value ($)"].sum()
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -213,31 +412,71 @@ def render_advanced_metrics(combined_df: pd.DataFrame, metrics: dict) -> None:
     # --- Asset Correlation Matrix ---
     st.subheader("📈 Asset Correlation Matrix")
 
-    price_wide = combined_df.pivot(index="Time", columns="Ticker", values="Price")
     corr_df = metrics.get("Correlation Matrix")
     if corr_df is None:
-        corr_df = price_wide.corr().round(6)  # fallback if not precomputed
-
+        if price_wide is None:
+            st.info("No data available for correlation matrix.")
+            return
+        # Fallback if not precomputed
+        prices = price_wide.to_numpy(dtype=np.float64)
+        corr_df = _cached_correlation(prices.tobytes(), prices.shape, tuple(price_wide.columns))
+
+    css = _corr_gradient_css(corr_df)
     st.dataframe(
-        corr_df.style.background_gradient(cmap="coolwarm", vmin=-1, vmax=1),
+        corr_df.style.apply(lambda _: css, axis=None),
         width="stretch"
     )
 
+def _export_frame(filtered_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Newest-first display/export frame for the filtered long frame: Date and Time
+    strings, Quantity narrowed to int32, and Price and dollar amounts rounded to
+    cents in float64.
+    """
+    # combined_df is already sorted by Time: reverse it for newest-first instead of re-sorting
+    rev = filtered_df.iloc[::-1]
+
+    # Format via datetime64[s] -> str ("YYYY-MM-DDTHH:MM:SS", no per-row strftime),
+    # on local wall-clock times for tz-aware data, then split into date and time
+    times = rev["Time"]
+    local = times.dt.tz_localize(None) if times.dt.tz else times
+    iso = local.to_numpy().astype("datetime64[s]").astype("U19")
+
+    # Build the frame straight from the column arrays (no block copy and column setitem)
+    return pd.DataFrame({
+        "Date": iso.astype("U10"),
+        "Time": np.char.partition(iso, "T")[:, 2],
+        "Ticker": rev["Ticker"].values,
+        "Quantity": rev["Quantity"].to_numpy().astype(np.int32),
+        "Price": rev["Price"].to_numpy().round(2),
+        "Position Value ($)": rev["Position Value ($)"].to_numpy().round(2),
+        "PnL": rev["PnL"].to_numpy().round(2),
+    })
+
+
+@st.fragment
 def render_editable_table(combined_df: pd.DataFrame) -> None:
     """
     Editable Table: Interactive PnL Table with CSV Export ---
+
+    Runs as a fragment: changing the ticker or date filters reruns only this
+    section, not the upstream PnL, chart and metrics pipeline.
     """
     st.subheader("🔍 Explore & Export PnL Data")
 
+    # Ticker is categorical: the options come from its categories, not a row scan
+    ticker_options = sorted(combined_df["Ticker"].cat.categories)
     tickers_selected = st.multiselect(
         "Select Ticker(s)",
-        options=sorted(combined_df["Ticker"].unique().tolist()),
-        default=sorted(combined_df["Ticker"].unique().tolist()),
+        options=ticker_options,
+        default=ticker_options,
         key="export_ticker_select"
     )
 
-    date_min = combined_df["Time"].min().date()
-    date_max = combined_df["Time"].max().date()
+    # combined_df is sorted by Time: the bounds are its first and last rows
+    times = pd.DatetimeIndex(combined_df["Time"])
+    date_min = times[0].date()
+    date_max = times[-1].date()
 
     date_range = st.date_input(
         "Select Date Range",
@@ -255,11 +494,19 @@ def render_editable_table(combined_df: pd.DataFrame) -> None:
         start_date = date_min
         end_date = date_max
 
-    filtered_df = combined_df[
-        combined_df["Ticker"].isin(tickers_selected)
-        & (combined_df["Time"].dt.date >= start_date)
-        & (combined_df["Time"].dt.date <= end_date)
-    ].copy()
+    # Slice the date range with two binary searches on the sorted times
+    lo = times.searchsorted(pd.Timestamp(start_date, tz=times.tz))
+    hi = times.searchsorted(pd.Timestamp(end_date, tz=times.tz) + pd.Timedelta(days=1))
+    date_slice = combined_df.iloc[lo:hi]
+    # Match tickers on their categorical codes (int membership, no string hashing);
+    # with every ticker selected (the default) the date slice is used as is.
+    # The slice is only read below, so no defensive .copy()
+    ticker_col = date_slice["Ticker"]
+    selected_codes = ticker_col.cat.categories.get_indexer(tickers_selected)
+    if len(set(selected_codes)) == len(ticker_options):
+        filtered_df = date_slice
+    else:
+        filtered_df = date_slice[np.isin(ticker_col.cat.codes.to_numpy(), selected_codes)]
 
     if not filtered_df.empty:
         total_pnl_filtered = filtered_df["PnL"].sum()
@@ -267,33 +514,17 @@ def render_editable_table(combined_df: pd.DataFrame) -> None:
         total_value_filtered = filtered_df["Position Value ($)"].sum()
         avg_price_filtered = filtered_df["Price"].mean()
 
-
-        df_display = filtered_df.sort_values("Time", ascending=False).copy()
-
-        df_display["Date"] = df_display["Time"].dt.strftime("%Y-%m-%d")
-        df_display["Time"] = df_display["Time"].dt.strftime("%H:%M:%S")
-
-        cols = ["Date", "Time"] + [c for c in df_display.columns if c not in ["Date", "Time"]]
-        df_display = df_display[cols].reset_index(drop=True)
-
-        for col in ["Price", "Position Value ($)", "PnL"]:
-            if col in df_display.columns:
-                df_display[col] = df_display[col].astype(float).round(2)
+        df_display = _export_frame(filtered_df)
 
         # Use the new width='stretch' for st.dataframe (native component)
         st.dataframe(
-            df_display.style.format({
-                "Quantity": "{:,.0f}",
-                "Price": "{:,.2f}",
-                "PnL": "{:,.2f}",
-                "Position Value ($)": "{:,.2f}"
-            }),
+            df_display.style.format(_DISPLAY_FMT),
             width="stretch",
             hide_index=True
         )
 
         filename = f"pnl_data_{'_'.join(tickers_selected)}_{start_date}_{end_date}.csv"
-        csv_data = df_display.to_csv(index=False).encode("utf-8")
+        csv_data = _encode_csv(df_display)
         st.download_button(
             label="💾 Download filtered data as CSV",
             data=csv_data,
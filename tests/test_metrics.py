@@ -6,9 +6,12 @@ from src.metrics import (
     max_drawdown,
     calculate_var,
     calculate_cvar,
+    var_and_cvar,
     sharpe_ratio,
     sortino_ratio,
     calmar_ratio,
+    return_metrics,
+    correlation_matrix,
     win_loss_stats
 )
 
@@ -34,6 +37,15 @@ def test_calculate_cvar_known_values():
     expected = returns[returns <= var_95].mean()
     assert np.isclose(cvar_95, expected)
 
+def test_var_and_cvar_match_separate_functions():
+    returns = pd.Series([0.01, -0.02, 0.015, -0.005, 0.03, -0.04, 0.002, 0.011])
+    for cl in (0.90, 0.95, 0.99):
+        var, cvar = var_and_cvar(returns, confidence_level=cl)
+        assert var == np.percentile(returns, (1 - cl) * 100)
+        assert np.isclose(cvar, returns[returns <= var].mean())
+        assert var == calculate_var(returns, confidence_level=cl)
+        assert cvar == calculate_cvar(returns, confidence_level=cl)
+
 def test_sharpe_ratio_positive():
     returns = pd.Series([0.01, 0.02, 0.015, 0.005, 0.03])
     result = sharpe_ratio(returns, risk_free_rate=0.0)
@@ -65,4 +77,26 @@ def test_win_loss_stats_counts():
     expected_pf = profits / losses
     assert np.isclose(stats["profit_factor"], expected_pf)
 
+def test_return_metrics_match_individual_functions():
+    returns = pd.Series([0.01, -0.02, 0.015, -0.005, 0.03, np.nan, -0.01])
+    stats = return_metrics(returns, risk_free_rate=0.02, confidence_level=0.95)
+
+    assert np.isclose(stats["var"], calculate_var(returns, confidence_level=0.95))
+    assert np.isclose(stats["cvar"], calculate_cvar(returns, confidence_level=0.95))
+    assert np.isclose(stats["sharpe"], sharpe_ratio(returns, risk_free_rate=0.02))
+    assert np.isclose(stats["sortino"], sortino_ratio(returns, risk_free_rate=0.02))
+    assert np.isclose(stats["calmar"], calmar_ratio(returns))
+
+def test_correlation_matrix_matches_pandas_returns_corr():
+    rng = np.random.default_rng(1)
+    prices = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(60, 3)), axis=0)),
+        columns=["AAA", "BBB", "CCC"]
+    )
+    prices.iloc[5, 1] = np.nan  # a missing bar drops the affected return rows
+
+    result = correlation_matrix(prices)
+    expected = prices.pct_change(fill_method=None).dropna().corr()
 
+    assert list(result.index) == list(result.columns) == ["AAA", "BBB", "CCC"]
+    assert np.allclose(result.to_numpy(), expected.to_numpy())
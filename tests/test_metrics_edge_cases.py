@@ -7,7 +7,11 @@ from src.metrics import (
     calmar_ratio,
     calculate_var,
     calculate_cvar,
+    var_and_cvar,
+    return_metrics,
     win_loss_stats,
+    max_drawdown,
+    correlation_matrix,
 )
 
 # -------------------------
@@ -53,6 +57,14 @@ def test_calmar_ratio_all_negative():
     result = calmar_ratio(returns)
     assert result < 0
 
+def test_calmar_ratio_annualizes_over_length_including_nans():
+    returns = pd.Series([0.01, np.nan, -0.02, 0.015, -0.005, 0.03])
+    cumulative = (1 + returns).cumprod()
+    annual_return = (1 + returns).prod() ** (252 / len(returns)) - 1
+    expected = annual_return / abs((cumulative / cumulative.cummax() - 1).min())
+    assert np.isclose(calmar_ratio(returns), expected)
+    assert np.isclose(return_metrics(returns)["calmar"], expected)
+
 # -------------------------
 # VaR & CVaR Edge Cases
 # -------------------------
@@ -63,6 +75,17 @@ def test_var_with_outlier():
     assert var_95 <= -0.3
 
 
+def test_var_and_cvar_with_ties_at_var():
+    returns = pd.Series([-0.02, -0.02, -0.02, 0.01, 0.03])
+    var, cvar = var_and_cvar(returns, confidence_level=0.95)
+    assert var == -0.02
+    assert np.isclose(cvar, -0.02)
+
+def test_var_and_cvar_empty_series():
+    var, cvar = var_and_cvar(pd.Series([], dtype=float))
+    assert np.isnan(var) and np.isnan(cvar)
+
+
 def test_cvar_different_confidence_levels():
     returns = pd.Series(np.random.normal(0, 0.01, 1000))
     cvar_90 = calculate_cvar(returns, confidence_level=0.90)
@@ -91,3 +114,47 @@ def test_win_loss_stats_with_zeros():
     returns = pd.Series([0.0, 0.01, -0.01])
     stats = win_loss_stats(returns)
     assert np.isclose(stats["win_rate"] + stats["loss_rate"], 2/3)
+
+# -------------------------
+# NumPy Array Inputs
+# -------------------------
+
+def test_metrics_accept_ndarray_with_nans():
+    values = [0.01, np.nan, -0.02, 0.015, -0.005, 0.03]
+    series = pd.Series(values)
+    array = np.array(values)
+    for func in (calculate_var, calculate_cvar, sharpe_ratio, sortino_ratio, calmar_ratio):
+        assert np.isclose(func(array), func(series))
+
+def test_max_drawdown_empty_input():
+    assert np.isnan(max_drawdown(np.array([], dtype=float)))
+
+def test_max_drawdown_all_nan_input():
+    assert np.isnan(max_drawdown(pd.Series([np.nan, np.nan])))
+
+def test_max_drawdown_ignores_nans_like_cummax():
+    values = pd.Series([100, np.nan, 120, 80, np.nan, 150])
+    expected = (values / values.cummax() - 1).min()
+    assert np.isclose(max_drawdown(values), expected)
+    assert np.isclose(max_drawdown(values.to_numpy()), expected)
+
+# -------------------------
+# Correlation Matrix Edge Cases
+# -------------------------
+
+def test_correlation_matrix_single_asset():
+    prices = pd.DataFrame({"AAA": [100.0, 101.0, 99.0, 102.0]})
+    result = correlation_matrix(prices)
+    assert result.shape == (1, 1)
+    assert np.isclose(result.loc["AAA", "AAA"], 1.0)
+
+def test_correlation_matrix_insufficient_data():
+    prices = pd.DataFrame({"AAA": [100.0, 101.0], "BBB": [50.0, 49.0]})
+    result = correlation_matrix(prices)
+    assert result.shape == (2, 2)
+    assert result.isna().all().all()
+
+def test_correlation_matrix_constant_price_is_nan():
+    prices = pd.DataFrame({"AAA": [100.0, 101.0, 99.0, 102.0], "BBB": [50.0] * 4})
+    result = correlation_matrix(prices)
+    assert np.isnan(result.loc["AAA", "BBB"])
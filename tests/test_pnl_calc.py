@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pnl_calc import build_price_panel, first_last_prices, calculate_pnl
+
+def _frame(closes, start="2024-01-01"):
+    idx = pd.date_range(start, periods=len(closes), freq="D")
+    return pd.DataFrame({"Close": closes}, index=idx)
+
+def test_calculate_pnl_known_values():
+    data = {"AAA": _frame([10.0, 11.0, 12.0]), "BBB": _frame([20.0, 19.0, 15.0])}
+    result = calculate_pnl(data, {"AAA": 10, "BBB": 2}).set_index("Ticker")
+
+    assert np.isclose(result.loc["AAA", "PnL ($)"], 20.0)
+    assert np.isclose(result.loc["AAA", "Change (%)"], 20.0)
+    assert np.isclose(result.loc["AAA", "Position Value ($)"], 120.0)
+    assert np.isclose(result.loc["BBB", "PnL ($)"], -10.0)
+    assert np.isclose(result.loc["BBB", "Change (%)"], -25.0)
+
+def test_calculate_pnl_ragged_histories_use_each_tickers_own_range():
+    # BBB starts two bars later than AAA: its start price is its own first bar
+    data = {"AAA": _frame([10.0, 11.0, 12.0, 13.0]),
+            "BBB": _frame([5.0, 6.0], start="2024-01-03")}
+    result = calculate_pnl(data, {"AAA": 1, "BBB": 1}).set_index("Ticker")
+
+    assert result.loc["BBB", "Start Price"] == 5.0
+    assert result.loc["BBB", "End Price"] == 6.0
+    assert result.loc["AAA", "End Price"] == 13.0
+
+def test_calculate_pnl_skips_empty_and_handles_zero_start():
+    data = {"AAA": _frame([0.0, 5.0]), "EMPTY": pd.DataFrame(), "NONE": None}
+    result = calculate_pnl(data, {"AAA": 3})
+
+    assert result["Ticker"].tolist() == ["AAA"]
+    assert result.loc[0, "Change (%)"] == 0.0
+    assert result.loc[0, "PnL ($)"] == 15.0
+
+def test_calculate_pnl_no_data():
+    assert calculate_pnl({}, {}).empty
+
+def test_build_price_panel_aligns_on_union_of_timestamps():
+    panel = build_price_panel({"AAA": _frame([1.0, 2.0, 3.0]),
+                               "BBB": _frame([4.0], start="2024-01-02")})
+    assert list(panel.columns) == ["AAA", "BBB"]
+    assert panel.shape == (3, 2)
+    assert panel["BBB"].isna().sum() == 2
+
+def test_first_last_prices_skip_nans():
+    prices = np.array([[np.nan, 1.0],
+                       [2.0, np.nan],
+                       [3.0, 4.0],
+                       [np.nan, np.nan]])
+    first, last = first_last_prices(prices)
+    assert first.tolist() == [2.0, 1.0]
+    assert last.tolist() == [3.0, 4.0]
+
+def test_calculate_pnl_accepts_prebuilt_panel():
+    data = {"AAA": _frame([10.0, 11.0, 12.0]), "BBB": _frame([20.0, 19.0, 15.0])}
+    qty = {"AAA": 10, "BBB": 2}
+    panel = build_price_panel(data)
+    pd.testing.assert_frame_equal(calculate_pnl(data, qty, panel), calculate_pnl(data, qty))
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit")
+
+# ui_sections uses the dashboard's flat imports (from metrics import ...)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from src.ui_sections import _export_frame, _pnl_table_frames
+
+def test_export_frame_keeps_cents_above_float32_range():
+    times = pd.date_range("2024-01-01", periods=2, freq="D", tz="America/New_York")
+    long_df = pd.DataFrame({
+        "Time": times,
+        "Ticker": pd.Categorical(["BRK-A", "BRK-A"]),
+        "Quantity": [3, 3],
+        "Price": [699999.991, 700123.4712],
+        "Position Value ($)": [2099999.97, 2100370.41],
+        "PnL": [0.0, 370.44],
+    })
+    result = _export_frame(long_df)
+
+    # Newest first; float32 would turn 700123.47 into 700123.5
+    assert result["Price"].dtype == np.float64
+    assert result["Price"].tolist() == [700123.47, 699999.99]
+    assert result["Date"].tolist() == ["2024-01-02", "2024-01-01"]
+    assert result["Quantity"].dtype == np.int32
+
+def test_pnl_table_keeps_cents_above_float32_range():
+    pnl_df = pd.DataFrame({
+        "Ticker": ["BRK-A"],
+        "Quantity": [3],
+        "Start Price": [699999.991],
+        "End Price": [700123.4712],
+        "PnL ($)": [370.44],
+        "Change (%)": [0.0176],
+        "Position Value ($)": [2100370.41],
+    })
+    table, _ = _pnl_table_frames(pnl_df)
+
+    assert table["Start Price"].iloc[0] == 699999.99
+    assert table["End Price"].iloc[0] == 700123.47